@@ -1,25 +1,70 @@
 #!/usr/bin/env python3
 """Pilk News Trader - CLI-based news-to-signal tool."""
 
-import sys
-from pathlib import Path
-from typing import Optional, List
+import csv
+import io
+import re
+from typing import Optional, List, Tuple
 
 import click
-import pandas as pd
 from rich.console import Console
-from rich.table import Table
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
-
-from src.aggregator import NewsAggregator, NewsItem
-from src.analyzer import NewsAnalyzer, NewsAnalysis, Sentiment, Impact, extract_crypto_assets
-from src.generator import SignalGenerator, format_signal, Direction
+# Heavy modules (HTTP/parsing stack, numpy) are imported where they are
+# used, so --help and argument errors stay fast
+from src.analyzer import NewsAnalysis, Sentiment, Impact, extract_crypto_assets
 
 
 console = Console()
 
+# Keyword heuristics for the rule-based fallback analysis.
+# Substring matches on the lowercased title, so "surge" also hits "surges".
+BULLISH, BEARISH, HIGH_IMPACT, MEDIUM_IMPACT = 1, 2, 4, 8
+KEYWORD_FLAGS = {
+    **dict.fromkeys(("surge", "rally", "soar", "jump", "gain", "bull", "positive"), BULLISH),
+    **dict.fromkeys(("plunge", "crash", "dump", "fall", "bear", "negative", "fear"), BEARISH),
+    **dict.fromkeys(("break", "record", "major", "significant", "alert", "urgent"), HIGH_IMPACT),
+    **dict.fromkeys(("update", "report", "data", "news"), MEDIUM_IMPACT),
+}
+# Zero-width lookahead reports overlapping occurrences, but only the first
+# alternative that matches at a given position. A keyword must therefore
+# not be a prefix of one with different flags ("break" would hide a
+# bearish "breakdown"), or that keyword's flag is silently lost.
+KEYWORD_RE = re.compile("(?=(" + "|".join(KEYWORD_FLAGS) + "))")
+
+
+def classify_titles(titles: List[str]) -> Tuple[List[Sentiment], List[Impact]]:
+    """Classify headline sentiment and impact with the keyword heuristics.
+
+    All titles are joined into one buffer and scanned once for every
+    keyword; match positions are mapped back to titles via their offsets.
+    """
+    import numpy as np
+
+    lowered = [title.lower() for title in titles]
+    buffer = "\n".join(lowered)
+    # Start offset of each title in the buffer
+    offsets = np.cumsum([0] + [len(title) + 1 for title in lowered[:-1]])
+
+    flags = np.zeros(len(lowered), dtype=np.uint8)
+    hits = [(m.start(), KEYWORD_FLAGS[m.group(1)]) for m in KEYWORD_RE.finditer(buffer)]
+    if hits:
+        positions, bits = zip(*hits)
+        rows = np.searchsorted(offsets, positions, side="right") - 1
+        np.bitwise_or.at(flags, rows, np.array(bits, dtype=np.uint8))
+
+    sentiments = np.select(
+        [(flags & BULLISH) > 0, (flags & BEARISH) > 0],
+        [Sentiment.BULLISH.value, Sentiment.BEARISH.value],
+        default=Sentiment.NEUTRAL.value,
+    )
+    impacts = np.select(
+        [(flags & HIGH_IMPACT) > 0, (flags & MEDIUM_IMPACT) > 0],
+        [Impact.HIGH.value, Impact.MEDIUM.value],
+        default=Impact.LOW.value,
+    )
+
+    return [Sentiment(s) for s in sentiments], [Impact(i) for i in impacts]
+
 
 @click.command()
 @click.option("--asset", help="Filter by asset (e.g., BTC, ETH)")
@@ -39,13 +84,15 @@ def main(
     verbose: bool,
 ):
     """Fetch news, analyze, and generate signals."""
+    from src.aggregator import NewsAggregator
+    from src.generator import Signal, SignalGenerator, format_signals, Direction
 
     console.print(f"📰 PILK NEWS-TRADER - {get_current_time()}\n")
 
     # Step 1: Fetch news
     with console.status("[bold green]Fetching news...", spinner="dots"):
-        aggregator = NewsAggregator()
-        news_items = aggregator.fetch(hours=hours)
+        with NewsAggregator() as aggregator:
+            news_items = aggregator.fetch(hours=hours, top_k=20)  # Limit to 20 for demo
 
     if not news_items:
         console.print("[yellow]No news found within time window.[/yellow]")
@@ -60,25 +107,9 @@ def main(
 
     # Placeholder: Simple rule-based analysis as fallback
     # In production, AI would analyze each item for proper sentiment/impact
-    for item in news_items[:20]:  # Limit to 20 for demo
-        title_lower = item.title.lower()
-
-        # Simple heuristic sentiment
-        if any(word in title_lower for word in ["surge", "rally", "soar", "jump", "gain", "bull", "positive"]):
-            sentiment_val = Sentiment.BULLISH
-        elif any(word in title_lower for word in ["plunge", "crash", "dump", "fall", "bear", "negative", "fear"]):
-            sentiment_val = Sentiment.BEARISH
-        else:
-            sentiment_val = Sentiment.NEUTRAL
-
-        # Simple heuristic impact
-        if any(word in title_lower for word in ["break", "record", "major", "significant", "alert", "urgent"]):
-            impact_val = Impact.HIGH
-        elif any(word in title_lower for word in ["update", "report", "data", "news"]):
-            impact_val = Impact.MEDIUM
-        else:
-            impact_val = Impact.LOW
+    sentiments, impacts = classify_titles([item.title for item in news_items])
 
+    for item, sentiment_val, impact_val in zip(news_items, sentiments, impacts):
         # Extract assets
         assets = extract_crypto_assets(item.title + " " + (item.summary or ""))
 
@@ -98,6 +129,7 @@ def main(
             actionable=len(assets) > 0,
             key_takeaways=[item.title[:80]] if assets else [],
             reasoning=f"Based on keywords in title: {sentiment_val.value} sentiment",
+            published_at=item.published_at,
         )
 
         analyses.append(analysis)
@@ -123,14 +155,16 @@ def main(
         output = [s.model_dump() for s in signals]
         console.print(json.dumps(output, indent=2, default=str))
     elif csv_output:
-        df = pd.DataFrame([s.model_dump() for s in signals])
-        console.print(df.to_csv(index=False))
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=list(Signal.model_fields))
+        writer.writeheader()
+        writer.writerows(s.model_dump() for s in signals)
+        console.print(buf.getvalue())
     else:
         # Pretty CLI output
         if signals:
-            for signal in signals:
-                console.print(format_signal(signal))
-                console.print()
+            console.print(format_signals(signals))
+            console.print()
         else:
             console.print("[yellow]No signals matching criteria.[/yellow]")
 
@@ -1,3 +1,30 @@
 """Pilk News Trader - News-to-signal tool."""
 
+from importlib import import_module
+
 __version__ = "0.1.0"
+
+# Public names resolve lazily (PEP 562) so importing one submodule does not
+# pull in the HTTP/parsing stack of the others
+_EXPORTS = {
+    "NewsAggregator": ".aggregator",
+    "NewsItem": ".aggregator",
+    "NewsAnalyzer": ".analyzer",
+    "NewsAnalysis": ".analyzer",
+    "Sentiment": ".analyzer",
+    "Impact": ".analyzer",
+    "extract_crypto_assets": ".analyzer",
+    "SignalGenerator": ".generator",
+    "Signal": ".generator",
+    "Direction": ".generator",
+    "format_signal": ".generator",
+    "format_signals": ".generator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
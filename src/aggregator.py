@@ -1,25 +1,114 @@
 """News aggregator module."""
 
-import feedparser
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from lxml import etree, html
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 import sqlite3
 import hashlib
 import json
-from typing import List, Dict, Optional
+import re
+import sys
+import threading
+from typing import List, Dict, Optional, Tuple
 from pydantic import BaseModel
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import heapq
 import logging
 
 CACHE_DB = Path(__file__).parent.parent / "data" / "cache.db"
 
+# lxml releases the GIL while parsing, so fetch workers parse feeds in
+# parallel; parsers must not be shared across threads, so each gets its own
+_parsers = threading.local()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the basis of every published_at."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _rss_parser() -> etree.XMLParser:
+    """Get this thread's RSS parser."""
+    parser = getattr(_parsers, "rss", None)
+    if parser is None:
+        # Tolerate slightly malformed feeds, never fetch external entities
+        parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+        _parsers.rss = parser
+    return parser
+
+
+# C0 control characters other than tab/newline/carriage return, and DEL
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _strip_html(fragment: str) -> str:
+    """Text content of an HTML fragment, such as an RSS description."""
+    # The recovering feed parser lets control characters through from
+    # references like &#1;, and lxml rejects or keeps them depending on
+    # where they fall
+    fragment = _CONTROL_CHARS_RE.sub("", fragment)
+    try:
+        return html.fragment_fromstring(fragment, create_parent="div").text_content().strip()
+    except (ValueError, etree.ParserError):
+        # Keep the raw text rather than losing the entry
+        return fragment.strip()
+
+
+def parse_feed(
+    content: bytes, cutoff: Optional[datetime] = None
+) -> Optional[List[Tuple[str, str, datetime, str]]]:
+    """Parse RSS bytes into (link, title, published_at, description) tuples.
+
+    Looks at the first 50 entries and drops those published at or before
+    cutoff. Returns None if the body is not a feed or has no entries. The
+    description is left as raw HTML so callers only strip it for items
+    they build.
+    """
+    try:
+        root = etree.fromstring(content, _rss_parser())
+    except etree.XMLSyntaxError:
+        return None  # Empty body
+    if root is None:
+        return None  # Nothing recoverable, e.g. a plain-text error page
+    entries = [
+        entry for entry in root.iter("item") if entry.findtext("link")
+    ][:50]  # Limit to 50 per source
+    if not entries:
+        return None
+
+    parsed = []
+    for entry in entries:
+        # Parse published date (RFC 822, stored as naive UTC)
+        published_at = _utcnow()
+        pub_date = entry.findtext("pubDate")
+        if pub_date:
+            try:
+                published_at = parsedate_to_datetime(pub_date)
+                if published_at.tzinfo is not None:
+                    published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+            except (ValueError, TypeError):
+                pass
+
+        if cutoff is not None and published_at <= cutoff:
+            continue
+
+        parsed.append((
+            entry.findtext("link").strip(),
+            (entry.findtext("title") or "").strip(),
+            published_at,
+            entry.findtext("description") or "",
+        ))
+
+    return parsed
+
+
 class NewsItem(BaseModel):
     """Single news item."""
 
@@ -66,26 +155,66 @@ class NewsAggregator:
         """
         self.cache_db = cache_db
         self.max_workers = max_workers
+        self._local = threading.local()
         self._init_cache()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; PilkNewsTrader/1.0)'
         })
+        # Keep enough warm keep-alive connections per host for every worker,
+        # so RSS and homepage requests reuse TCP/TLS sessions
+        adapter = HTTPAdapter(pool_connections=len(self.SOURCES), pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __del__(self):
         """Cleanup session on deletion."""
+        self.close()
+
+    def close(self):
+        """Close the HTTP session and this thread's cache connection."""
         if hasattr(self, 'session'):
             self.session.close()
+        conn = getattr(getattr(self, '_local', None), 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's cache connection, opening it on first use.
+
+        Worker threads are reused by the executor, so each one keeps a single
+        long-lived connection instead of reconnecting per cache access.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_db)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=67108864")
+            self._local.conn = conn
+        return conn
 
     def _init_cache(self):
         """Initialize SQLite cache."""
         self.cache_db.parent.mkdir(parents=True, exist_ok=True)
 
-        conn = sqlite3.connect(self.cache_db)
+        conn = self._connect()
+        # WAL is persistent on the database file and avoids the
+        # rollback-journal fsync on every commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        # news_cache keyed rows by hex MD5 strings; v2 uses 64-bit integer keys
+        conn.execute("DROP TABLE IF EXISTS news_cache")
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS news_cache (
-                url_hash TEXT PRIMARY KEY,
+            CREATE TABLE IF NOT EXISTS news_cache_v2 (
+                url_hash INTEGER PRIMARY KEY,
                 data TEXT,
                 cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -94,130 +223,255 @@ class NewsAggregator:
         conn.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_cached_at
-            ON news_cache(cached_at)
+            ON news_cache_v2(cached_at)
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feed_meta (
+                source_key TEXT PRIMARY KEY,
+                etag TEXT,
+                modified TEXT,
+                links TEXT,
+                cutoff TEXT
+            )
         """
         )
         conn.commit()
-        conn.close()
 
-    def _get_cache(self, url: str) -> Optional[Dict]:
-        """Get cached news item."""
+    @staticmethod
+    def _url_hash(url: str) -> int:
+        """Hash a URL to a signed 64-bit cache key.
+
+        Keys are only used for deduplication, so a short BLAKE2b digest is
+        enough and fits SQLite's INTEGER PRIMARY KEY (the rowid).
+        """
+        digest = hashlib.blake2b(url.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def _get_cache_batch(
+        self, urls: List[str], max_age: Optional[timedelta] = timedelta(hours=2)
+    ) -> Dict[str, NewsItem]:
+        """Get cached news items for many URLs with a single query.
+
+        Returns a mapping of URL to cached item for entries younger than
+        max_age (no age limit if None).
+        """
+        results = {}
+        if not urls:
+            return results
+
         try:
-            conn = sqlite3.connect(self.cache_db)
-            url_hash = hashlib.md5(url.encode()).hexdigest()
+            conn = self._connect()
+            url_by_hash = {self._url_hash(url): url for url in urls}
+            placeholders = ",".join("?" * len(url_by_hash))
 
             cursor = conn.execute(
-                "SELECT data, cached_at FROM news_cache WHERE url_hash = ?",
-                (url_hash,),
+                f"SELECT url_hash, data, cached_at FROM news_cache_v2 WHERE url_hash IN ({placeholders})",
+                list(url_by_hash),
             )
 
-            row = cursor.fetchone()
-            conn.close()
+            now = datetime.now()
+            for url_hash, data, cached_at in cursor:
+                # Cache is valid for 2 hours by default
+                if max_age is not None and now - datetime.fromisoformat(cached_at) >= max_age:
+                    continue
 
-            if row:
-                data, cached_at = row
-                # Cache is valid for 2 hours
-                if datetime.now() - datetime.fromisoformat(cached_at) < timedelta(hours=2):
-                    # Parse JSON with datetime string handling
-                    result = json.loads(data)
-                    # Convert published_at string back to datetime
-                    if "published_at" in result and isinstance(result["published_at"], str):
-                        result["published_at"] = datetime.fromisoformat(result["published_at"])
-                    return result
+                # Validate straight from JSON in pydantic-core, no dict round-trip
+                item = NewsItem.model_validate_json(data)
+                # Decoding makes a new source string per row; fetched items
+                # already share the SOURCES name, so only these are interned
+                item.source = sys.intern(item.source)
+                results[url_by_hash[url_hash]] = item
 
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
 
-        return None
+        return results
+
+    def _get_cache(self, url: str) -> Optional[NewsItem]:
+        """Get cached news item."""
+        return self._get_cache_batch([url]).get(url)
+
+    def _cache_row(self, url: str, item: NewsItem) -> tuple:
+        """Build a cache row for a news item."""
+        return (self._url_hash(url), item.model_dump_json(), datetime.now().isoformat())
+
+    def _flush_cache(self, rows: List[tuple]):
+        """Write cache rows in a single transaction."""
+        if not rows:
+            return
+
+        try:
+            conn = self._connect()
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO news_cache_v2 (url_hash, data, cached_at)
+                VALUES (?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Cache set error: {e}")
 
-    def _set_cache(self, url: str, data: Dict):
+    def _set_cache(self, url: str, item: NewsItem):
         """Cache news item."""
+        self._flush_cache([self._cache_row(url, item)])
+
+    def _get_feed_meta(self, source_key: str) -> Optional[tuple]:
+        """Get (etag, modified, links, cutoff) from the last full fetch of a feed."""
         try:
-            conn = sqlite3.connect(self.cache_db)
-            url_hash = hashlib.md5(url.encode()).hexdigest()
+            conn = self._connect()
+            cursor = conn.execute(
+                "SELECT etag, modified, links, cutoff FROM feed_meta WHERE source_key = ?",
+                (source_key,),
+            )
+            row = cursor.fetchone()
+            if row:
+                etag, modified, links, cutoff = row
+                return etag, modified, json.loads(links), cutoff and datetime.fromisoformat(cutoff)
+        except Exception as e:
+            logger.warning(f"Feed meta get error: {e}")
 
-            # Convert datetime to string for JSON serialization
-            def json_default(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                raise TypeError(f"Type {type(obj)} not serializable")
+        return None
 
+    def _set_feed_meta(
+        self,
+        source_key: str,
+        etag: Optional[str],
+        modified: Optional[str],
+        links: List[str],
+        cutoff: Optional[datetime],
+    ):
+        """Remember validators and cached entry links for conditional GETs."""
+        try:
+            conn = self._connect()
             conn.execute(
                 """
-                INSERT OR REPLACE INTO news_cache (url_hash, data, cached_at)
-                VALUES (?, ?, ?)
+                INSERT OR REPLACE INTO feed_meta (source_key, etag, modified, links, cutoff)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                (url_hash, json.dumps(data, default=json_default), datetime.now().isoformat()),
+                (source_key, etag, modified, json.dumps(links), cutoff and cutoff.isoformat()),
             )
-
             conn.commit()
-            conn.close()
         except Exception as e:
-            logger.warning(f"Cache set error: {e}")
+            logger.warning(f"Feed meta set error: {e}")
+
+    def _fetch_rss(
+        self, source_key: str, cutoff: Optional[datetime] = None
+    ) -> Optional[List[NewsItem]]:
+        """Fetch news from RSS feed.
 
-    def _fetch_rss(self, source_key: str) -> List[NewsItem]:
-        """Fetch news from RSS feed."""
+        Entries published at or before cutoff are skipped before an item is
+        built. Returns None if the feed could not be read or has no entries.
+        """
         source = self.SOURCES[source_key]
         items = []
+        cache_rows = []
+        feed_meta = None
+
+        def in_window(published_at: datetime) -> bool:
+            return cutoff is None or published_at > cutoff
 
         try:
-            feed = feedparser.parse(source["rss"])
+            # Conditional GET: an unchanged feed answers 304 with no body.
+            # Entries older than the last run's cutoff were never cached, so
+            # a 304 can only be served when this window is no wider.
+            headers = {}
+            meta = self._get_feed_meta(source_key)
+            if meta:
+                etag, modified, links, meta_cutoff = meta
+                if meta_cutoff is None or (cutoff is not None and cutoff >= meta_cutoff):
+                    if etag:
+                        headers["If-None-Match"] = etag
+                    if modified:
+                        headers["If-Modified-Since"] = modified
+
+            response = self.session.get(source["rss"], headers=headers, timeout=10)
+            response.raise_for_status()
 
-            for entry in feed.entries[:50]:  # Limit to 50 per source
+            if response.status_code == 304 and headers:
+                # Feed unchanged, so its entries are still current
+                cache = self._get_cache_batch(links, max_age=None)
+                return [
+                    cache[link] for link in links
+                    if link in cache and in_window(cache[link].published_at)
+                ]
+
+            # Entries outside the window are dropped here, before any HTML
+            # stripping or validation
+            entries = parse_feed(response.content, cutoff)
+            if entries is None:
+                return None
+            cache = self._get_cache_batch([link for link, *_ in entries])
+
+            for link, title, published_at, summary in entries:
                 # Check cache
-                cached = self._get_cache(entry.link)
+                cached = cache.get(link)
                 if cached:
-                    items.append(NewsItem(**cached))
+                    items.append(cached)
                     continue
 
-                # Parse published date
-                published_at = datetime.now()
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    try:
-                        published_at = datetime(*entry.published_parsed[:6])
-                    except (ValueError, TypeError):
-                        pass
-
-                # Get summary
-                summary = entry.get("summary", "")
                 # Strip HTML tags
-                if summary:
-                    soup = BeautifulSoup(summary, "html.parser")
-                    summary = soup.get_text(strip=True)
+                if summary.strip():
+                    summary = _strip_html(summary)
 
                 # Create item
                 item = NewsItem(
-                    title=entry.get("title", "")[:200],  # Limit title length
-                    url=entry.link,
+                    title=title[:200],  # Limit title length
+                    url=link,
                     source=source["name"],
                     published_at=published_at,
                     summary=summary[:500] if summary else None,
                 )
 
                 # Cache it
-                self._set_cache(entry.link, item.model_dump())
+                cache_rows.append(self._cache_row(link, item))
 
                 items.append(item)
 
+            feed_meta = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                [item.url for item in items],
+                cutoff,
+            )
+
         except Exception as e:
             logger.warning(f"Error fetching {source['name']} RSS: {e}")
+            if not items:
+                items = None
+
+        self._flush_cache(cache_rows)
+        # Only remember validators once the entries they cover are cached
+        if feed_meta:
+            self._set_feed_meta(source_key, *feed_meta)
 
         return items
 
-    def _scrape_homepage(self, source_key: str) -> List[NewsItem]:
+    def _scrape_homepage(
+        self, source_key: str, cutoff: Optional[datetime] = None
+    ) -> List[NewsItem]:
         """Fallback: Scrape homepage headlines."""
         source = self.SOURCES[source_key]
         items = []
+        cache_rows = []
 
         try:
             response = self.session.get(source["homepage"], timeout=10)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Only the scraping fallback needs BeautifulSoup
+            from bs4 import BeautifulSoup
+
+            # lxml is the C-backed tree builder, much faster than html.parser on full pages
+            soup = BeautifulSoup(response.text, "lxml")
 
             # Try common headline selectors
             selectors = ["h2 a", "h3 a", ".article-title a", "[data-test='article-title']", "article h2 a"]
 
+            headlines = []
             for selector in selectors:
                 links = soup.select(selector)
                 if links:
@@ -229,46 +483,56 @@ class NewsAggregator:
                             # Resolve relative URLs
                             if not url.startswith("http"):
                                 url = source["homepage"].rstrip("/") + url
+                            headlines.append((url, title))
 
-                            # Check cache
-                            cached = self._get_cache(url)
-                            if cached:
-                                items.append(NewsItem(**cached))
-                                continue
+                    break  # Found a working selector
 
-                            item = NewsItem(
-                                title=title[:200],
-                                url=url,
-                                source=source["name"],
-                                published_at=datetime.now(),
-                            )
+            cache = self._get_cache_batch([url for url, _ in headlines])
 
-                            # Cache it
-                            self._set_cache(url, item.model_dump())
+            for url, title in headlines:
+                # Check cache
+                cached = cache.get(url)
+                if cached:
+                    if cutoff is None or cached.published_at > cutoff:
+                        items.append(cached)
+                    continue
+
+                item = NewsItem(
+                    title=title[:200],
+                    url=url,
+                    source=source["name"],
+                    published_at=_utcnow(),
+                )
 
-                            items.append(item)
+                # Cache it
+                cache_rows.append(self._cache_row(url, item))
 
-                    break  # Found a working selector
+                items.append(item)
 
         except Exception as e:
             logger.warning(f"Error scraping {source['name']}: {e}")
 
+        self._flush_cache(cache_rows)
+
         return items
 
     def fetch(
-        self, hours: int = 24, sources: Optional[List[str]] = None
+        self, hours: int = 24, sources: Optional[List[str]] = None, top_k: Optional[int] = None
     ) -> List[NewsItem]:
-        """Fetch news from all sources within time window."""
+        """Fetch news from all sources within time window.
+
+        If top_k is given, only the top_k most recent items are returned.
+        """
         if sources is None:
             sources = list(self.SOURCES.keys())
 
         all_items = []
-        cutoff = datetime.now() - timedelta(hours=hours)
+        cutoff = _utcnow() - timedelta(hours=hours)
 
         # Parallel fetch from all sources
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_source = {
-                executor.submit(self._fetch_source, source_key): source_key
+                executor.submit(self._fetch_source, source_key, cutoff): source_key
                 for source_key in sources
             }
 
@@ -281,24 +545,25 @@ class NewsAggregator:
                 except Exception as e:
                     logger.warning(f"Failed to fetch {source_key}: {e}")
 
-        # Sort by published date (newest first)
-        all_items.sort(key=lambda x: x.published_at, reverse=True)
+        logger.info(f"Total: {len(all_items)} articles within {hours}h window")
 
-        # Filter by time
-        all_items = [item for item in all_items if item.published_at > cutoff]
+        # Newest first; sources already dropped anything outside the window.
+        # A bounded heap avoids sorting everything when only top_k are used.
+        if top_k is not None:
+            return heapq.nlargest(top_k, all_items, key=lambda x: x.published_at)
 
-        logger.info(f"Total: {len(all_items)} articles within {hours}h window")
+        all_items.sort(key=lambda x: x.published_at, reverse=True)
 
         return all_items
 
-    def _fetch_source(self, source_key: str) -> List[NewsItem]:
+    def _fetch_source(self, source_key: str, cutoff: Optional[datetime] = None) -> List[NewsItem]:
         """Fetch from a single source with fallback."""
         # Try RSS first
-        items = self._fetch_rss(source_key)
+        items = self._fetch_rss(source_key, cutoff)
 
-        # Fallback to scraping if RSS is empty
-        if not items:
+        # Fallback to scraping if RSS is unavailable or empty
+        if items is None:
             logger.info(f"RSS empty for {self.SOURCES[source_key]['name']}, trying scraping...")
-            items = self._scrape_homepage(source_key)
+            items = self._scrape_homepage(source_key, cutoff)
 
         return items
@@ -4,12 +4,18 @@ This module provides a framework for analyzing news items.
 The actual analysis is done by AI model (me) when analyzer is called.
 """
 
-from typing import List, Dict
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, FrozenSet, List, Dict, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
 
-from .aggregator import NewsItem
+if TYPE_CHECKING:
+    # Type-only: importing the aggregator loads requests/lxml/bs4
+    from .aggregator import NewsItem
 
 
 class Sentiment(str, Enum):
@@ -39,6 +45,9 @@ class NewsAnalysis(BaseModel):
     actionable: bool
     key_takeaways: List[str]
     reasoning: str
+    # Naive values are taken as UTC, as the aggregator stores them; pass
+    # datetime.now(timezone.utc) rather than local datetime.now()
+    published_at: Optional[datetime] = None
 
 
 class NewsAnalyzer:
@@ -89,33 +98,42 @@ class NewsAnalyzer:
             actionable=actionable,
             key_takeaways=key_takeaways,
             reasoning=reasoning,
+            published_at=item.published_at,
         )
 
 
+# Major assets
+KNOWN_ASSETS = (
+    "BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "DOT", "MATIC", "LINK",
+    "AVAX", "UNI", "ATOM", "LTC", "BCH", "ETC", "ALGO", "VET", "FIL",
+    "XLM", "HBAR", "NEAR", "APE", "SAND", "MANA", "AXS", "GALA",
+)
+
+# Full names that map to a ticker
+ASSET_ALIASES = {"BITCOIN": "BTC", "ETHEREUM": "ETH"}
+
+# Ticker for every whole word that names an asset. Tickers and names are
+# all word characters, so a whole-word match is exactly a word token equal
+# to one; a dict lookup per token keeps the scan linear in the text however
+# many assets are listed
+_ASSET_LOOKUP = {**dict(zip(KNOWN_ASSETS, KNOWN_ASSETS)), **ASSET_ALIASES}
+_WORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=4096)
+def _extract_assets(text_upper: str) -> FrozenSet[str]:
+    """Match assets in uppercased text (memoized, headlines repeat across sources)."""
+    return frozenset(
+        _ASSET_LOOKUP[word] for word in _WORD_RE.findall(text_upper) if word in _ASSET_LOOKUP
+    )
+
+
 # Helper function for AI to use during analysis
 def extract_crypto_assets(text: str) -> List[str]:
     """Extract crypto asset mentions from text.
 
     Common assets: BTC, ETH, SOL, XRP, ADA, DOGE, DOT, etc.
+    Tickers and names must appear as whole words, so "ETC" in "FETCH"
+    is not a match.
     """
-    assets = []
-    text_upper = text.upper()
-
-    # Major assets
-    known_assets = [
-        "BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "DOT", "MATIC", "LINK",
-        "AVAX", "UNI", "ATOM", "LTC", "BCH", "ETC", "ALGO", "VET", "FIL",
-        "XLM", "HBAR", "NEAR", "APE", "SAND", "MANA", "AXS", "GALA",
-    ]
-
-    for asset in known_assets:
-        if asset in text_upper:
-            assets.append(asset)
-
-    # Also check for full names
-    if "BITCOIN" in text_upper and "BTC" not in assets:
-        assets.append("BTC")
-    if "ETHEREUM" in text_upper and "ETH" not in assets:
-        assets.append("ETH")
-
-    return list(set(assets))  # Deduplicate
+    return list(_extract_assets(text.upper()))
@@ -3,10 +3,15 @@
 Aggregates analyzed news and generates tradeable signals.
 """
 
-from typing import List, Dict
+import re
+from bisect import bisect_left
+from typing import List, Dict, Optional
 from collections import defaultdict
+from itertools import chain
+from operator import attrgetter
+import numpy as np
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 
 from .analyzer import NewsAnalysis, Sentiment
@@ -19,6 +24,51 @@ class Direction(str, Enum):
     NEUTRAL = "NEUTRAL"
 
 
+# Score tables, built once instead of per lookup
+_SENTIMENT_SCORES = {Sentiment.BULLISH: 1, Sentiment.BEARISH: -1, Sentiment.NEUTRAL: 0}
+_IMPACT_SCORES = {"high": 3, "medium": 2, "low": 1}
+
+# Recency decay: 1.0 for 0-6h, 0.7 for 6-12h, 0.4 beyond; upper bin edges
+# are inclusive, matching bisect_left and searchsorted's default side
+_RECENCY_BINS = (6.0, 12.0)
+_RECENCY_SCORES = (1.0, 0.7, 0.4)
+
+# Direction by sign of the thresholded net sentiment: -1, 0, +1 shifted
+# to index 0, 1, 2
+_DIRECTION_TABLE = (Direction.SHORT, Direction.NEUTRAL, Direction.LONG)
+
+# Reasoning that mentions risk becomes a risk note; searched without
+# lowercasing a copy of the text
+_RISK_RE = re.compile("risk", re.IGNORECASE)
+
+
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the basis the aggregator stores publish times in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC; naive ones are taken as UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _aggregate(
+    group_ids: np.ndarray, sentiments: np.ndarray, weights: np.ndarray, n_groups: int
+) -> tuple:
+    """Reduce per-news scores into per-asset totals in one grouped pass.
+
+    Returns (total_score, total_weight, bullish_count, bearish_count) arrays
+    indexed by group id.
+    """
+    total_score = np.bincount(group_ids, weights=sentiments * weights, minlength=n_groups)
+    total_weight = np.bincount(group_ids, weights=weights, minlength=n_groups)
+    bullish = np.bincount(group_ids[sentiments == 1], minlength=n_groups)
+    bearish = np.bincount(group_ids[sentiments == -1], minlength=n_groups)
+    return total_score, total_weight, bullish, bearish
+
+
 class Signal(BaseModel):
     """Tradeable signal."""
 
@@ -48,24 +98,72 @@ class SignalGenerator:
 
     def _score_sentiment(self, sentiment: Sentiment) -> int:
         """Convert sentiment to score."""
-        scores = {Sentiment.BULLISH: 1, Sentiment.BEARISH: -1, Sentiment.NEUTRAL: 0}
-        return scores.get(sentiment, 0)
+        return _SENTIMENT_SCORES.get(sentiment, 0)
 
     def _score_impact(self, impact: str) -> int:
         """Convert impact to score."""
-        scores = {"high": 3, "medium": 2, "low": 1}
-        return scores.get(impact, 1)
+        return _IMPACT_SCORES.get(impact, 1)
 
-    def _score_recency(self, published_at: datetime) -> float:
+    def _score_recency(self, published_at: datetime, now: Optional[datetime] = None) -> float:
         """Newer news = higher score."""
-        hours_old = (datetime.now() - published_at).total_seconds() / 3600
-        # Decay: 1.0 for 0-6h, 0.7 for 6-12h, 0.4 for 12-24h
-        if hours_old <= 6:
-            return 1.0
-        elif hours_old <= 12:
-            return 0.7
-        else:
-            return 0.4
+        if now is None:
+            now = _utcnow()
+        hours_old = (now - _naive_utc(published_at)).total_seconds() / 3600
+        return _RECENCY_SCORES[bisect_left(_RECENCY_BINS, hours_old)]
+
+    def _score_batch(
+        self, analyses: List[NewsAnalysis], asset_news: Dict[str, List[int]], now: datetime
+    ) -> tuple:
+        """Per-asset (total_score, total_weight, bullish, bearish) totals.
+
+        Every analysis is scored once as parallel arrays (SoA); news naming
+        several assets reuses its scores, and the weighting is a handful of
+        ufunc calls instead of a Python loop.
+        """
+        count = len(analyses)
+        sentiment_scores = np.fromiter(
+            (_SENTIMENT_SCORES.get(a.sentiment, 0) for a in analyses), dtype=np.int8, count=count
+        )
+        impact_scores = np.fromiter(
+            (_IMPACT_SCORES.get(a.impact, 1) for a in analyses), dtype=np.int8, count=count
+        )
+        # Recency tiers for all news in one branchless lookup; news without
+        # a publish time counts as fresh
+        published_at = np.array(
+            [_naive_utc(a.published_at) if a.published_at else now for a in analyses],
+            dtype="datetime64[us]",
+        )
+        hours_old = (np.datetime64(now, "us") - published_at) / np.timedelta64(1, "h")
+        recency_scores = np.take(_RECENCY_SCORES, np.searchsorted(_RECENCY_BINS, hours_old))
+        # Sources as small integer codes into an authority table; the last
+        # slot is the default for unknown sources
+        source_index = {name: i for i, name in enumerate(self.SOURCE_AUTHORITY)}
+        source_table = np.array([*self.SOURCE_AUTHORITY.values(), 0.7])
+        source_codes = np.fromiter(
+            (source_index.get(a.source, len(source_index)) for a in analyses), dtype=np.intp, count=count
+        )
+        source_scores = source_table[source_codes]
+        confidence_scores = np.fromiter(
+            (a.confidence for a in analyses), dtype=np.float64, count=count
+        ) / 100.0
+
+        # Weight = sentiment * impact * recency * source_authority * confidence
+        weights = (
+            np.abs(sentiment_scores)
+            * impact_scores
+            * recency_scores
+            * source_scores
+            * confidence_scores
+        )
+
+        # Flatten asset memberships so every asset is reduced at once
+        group_ids = np.repeat(
+            np.arange(len(asset_news)), [len(indices) for indices in asset_news.values()]
+        )
+        members = np.fromiter(
+            chain.from_iterable(asset_news.values()), dtype=np.intp, count=len(group_ids)
+        )
+        return _aggregate(group_ids, sentiment_scores[members], weights[members], len(asset_news))
 
     def generate_signals(
         self,
@@ -73,56 +171,35 @@ class SignalGenerator:
         min_confidence: int = 0,
     ) -> List[Signal]:
         """Generate signals from analyzed news."""
-        # Group by asset
-        asset_news: Dict[str, List[NewsAnalysis]] = defaultdict(list)
-        for analysis in analyses:
+        updated_at = datetime.now(timezone.utc)
+        # Recency is scored on naive UTC, the basis of published_at
+        now = updated_at.replace(tzinfo=None)
+        # Only actionable news contributes to signals
+        analyses = [a for a in analyses if a.actionable]
+
+        # Group by asset, as indices into analyses
+        asset_news: Dict[str, List[int]] = defaultdict(list)
+        for i, analysis in enumerate(analyses):
             for asset in analysis.assets:
-                if analysis.actionable:
-                    asset_news[asset].append(analysis)
+                asset_news[asset].append(i)
 
-        signals = []
+        total_scores, total_weights, bullish_counts, bearish_counts = self._score_batch(
+            analyses, asset_news, now
+        )
 
-        for asset, news_list in asset_news.items():
-            # Calculate weighted score
-            total_score = 0.0
-            total_weight = 0.0
-            key_drivers = []
-            risk_notes = []
-            bullish_count = 0
-            bearish_count = 0
-
-            for news in news_list:
-                # Weight = sentiment * impact * recency * source_authority * confidence
-                sentiment_score = self._score_sentiment(news.sentiment)
-                impact_score = self._score_impact(news.impact)
-                recency_score = self._score_recency(datetime.now())  # Simplified
-                source_score = self.SOURCE_AUTHORITY.get(news.source, 0.7)
-                confidence_score = news.confidence / 100.0
-
-                weight = (
-                    abs(sentiment_score)
-                    * impact_score
-                    * recency_score
-                    * source_score
-                    * confidence_score
-                )
-
-                total_score += sentiment_score * weight
-                total_weight += weight
-
-                # Track sentiment counts
-                if news.sentiment == Sentiment.BULLISH:
-                    bullish_count += 1
-                elif news.sentiment == Sentiment.BEARISH:
-                    bearish_count += 1
+        # Risk mentions are checked only for news behind emitted signals,
+        # at most once per analysis however many assets it names
+        has_risk: Dict[int, bool] = {}
 
-                # Collect key drivers
-                if news.impact in ["high", "medium"]:
-                    key_drivers.append(f"• {news.title[:80]}... ({news.source})")
+        signals = []
 
-                # Collect risk notes from reasoning
-                if "risk" in news.reasoning.lower():
-                    risk_notes.append(news.reasoning[:100])
+        for group, (asset, indices) in enumerate(asset_news.items()):
+            total_score = float(total_scores[group])
+            total_weight = float(total_weights[group])
+
+            # Track sentiment counts
+            bullish_count = int(bullish_counts[group])
+            bearish_count = int(bearish_counts[group])
 
             # Skip if not enough data
             if total_weight < 1.0:
@@ -130,16 +207,11 @@ class SignalGenerator:
 
             # Calculate direction
             net_sentiment = total_score / total_weight
-
-            if net_sentiment > 0.2:
-                direction = Direction.LONG
-            elif net_sentiment < -0.2:
-                direction = Direction.SHORT
-            else:
-                direction = Direction.NEUTRAL
+            direction = _DIRECTION_TABLE[(net_sentiment > 0.2) - (net_sentiment < -0.2) + 1]
 
             # Calculate confidence
-            sentiment_confidence = min(bullish_count, bearish_count) / max(bullish_count, bearish_count, 1)
+            lo, hi = (bullish_count, bearish_count) if bullish_count <= bearish_count else (bearish_count, bullish_count)
+            sentiment_confidence = lo / hi if hi else 0.0
             weight_confidence = min(total_weight / 3.0, 1.0)
             confidence = int((sentiment_confidence * 0.4 + weight_confidence * 0.6) * 100)
 
@@ -147,38 +219,53 @@ class SignalGenerator:
             if confidence < min_confidence:
                 continue
 
-            # Limit key drivers and risk notes
-            key_drivers = key_drivers[:5]
-            risk_notes = risk_notes[:3]
+            # Collect key drivers and risk notes only for signals that are
+            # kept, stopping at 5 drivers and 3 notes
+            key_drivers = []
+            risk_notes = []
+            for i in indices:
+                news = analyses[i]
+                # Collect key drivers
+                if len(key_drivers) < 5 and news.impact in ["high", "medium"]:
+                    key_drivers.append(f"• {news.title[:80]}... ({news.source})")
+
+                # Collect risk notes from reasoning
+                if len(risk_notes) < 3:
+                    if i not in has_risk:
+                        has_risk[i] = _RISK_RE.search(news.reasoning) is not None
+                    if has_risk[i]:
+                        risk_notes.append(news.reasoning[:100])
 
             # Add risk note if mixed signals
             if bullish_count > 0 and bearish_count > 0:
                 risk_notes.append(f"Mixed signals: {bullish_count} bullish, {bearish_count} bearish")
 
-            # Create signal
-            signal = Signal(
+            # Create signal; every field is computed here, so skip validation
+            signal = Signal.model_construct(
                 asset=asset,
                 direction=direction,
                 confidence=confidence,
                 key_drivers=key_drivers,
                 risk_notes=risk_notes,
-                news_count=len(news_list),
-                last_updated=datetime.now(),
+                news_count=len(indices),
+                last_updated=updated_at,
             )
 
             signals.append(signal)
 
         # Sort by confidence
-        signals.sort(key=lambda x: x.confidence, reverse=True)
+        signals.sort(key=attrgetter("confidence"), reverse=True)
 
         return signals
 
 
-def format_signal(signal: Signal) -> str:
-    """Format signal for CLI output."""
-    direction_emoji = {Direction.LONG: "🟢", Direction.SHORT: "🔴", Direction.NEUTRAL: "⚪"}
+# Emoji per direction for CLI output
+_DIRECTION_EMOJI = {Direction.LONG: "🟢", Direction.SHORT: "🔴", Direction.NEUTRAL: "⚪"}
+
 
-    output = [f"{direction_emoji[signal.direction]} {signal.asset} | {signal.direction.value} | {signal.confidence}% confidence"]
+def _signal_lines(signal: Signal, output: List[str]) -> None:
+    """Append the CLI lines for one signal to output."""
+    output.append(f"{_DIRECTION_EMOJI[signal.direction]} {signal.asset} | {signal.direction.value} | {signal.confidence}% confidence")
     output.append("=" * 60)
 
     if signal.key_drivers:
@@ -191,4 +278,19 @@ def format_signal(signal: Signal) -> str:
 
     output.append(f"\nNews analyzed: {signal.news_count}")
 
+
+def format_signal(signal: Signal) -> str:
+    """Format signal for CLI output."""
+    output: List[str] = []
+    _signal_lines(signal, output)
+    return "\n".join(output)
+
+
+def format_signals(signals: List[Signal]) -> str:
+    """Format signals for CLI output, separated by blank lines, in one join."""
+    output: List[str] = []
+    for signal in signals:
+        if output:
+            output.append("")
+        _signal_lines(signal, output)
     return "\n".join(output)
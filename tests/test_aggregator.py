@@ -1,12 +1,13 @@
 """Tests for news aggregator."""
 
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 from pathlib import Path
 import sqlite3
+import threading
 
-from src.aggregator import NewsAggregator, NewsItem
+from src.aggregator import NewsAggregator, NewsItem, parse_feed, _rss_parser
 
 
 class TestNewsAggregator:
@@ -27,6 +28,13 @@ class TestNewsAggregator:
         """Test aggregator initializes cache."""
         assert temp_cache_db.exists()
 
+    def test_context_manager_closes(self, temp_cache_db):
+        """Test aggregator releases its connections on exit."""
+        with NewsAggregator(cache_db=temp_cache_db) as aggregator:
+            assert aggregator._get_cache("https://test.com") is None
+
+        assert aggregator._local.conn is None
+
     def test_news_item_creation(self):
         """Test NewsItem model validation."""
         item = NewsItem(
@@ -41,24 +49,93 @@ class TestNewsAggregator:
         assert item.source == "Test Source"
         assert "Bitcoin" in item.title
 
+    def test_cached_items_share_source(self, aggregator):
+        """Test items read back from the cache share one string object per source."""
+        urls = ["https://test.com/1", "https://test.com/2"]
+        aggregator._flush_cache([
+            aggregator._cache_row(url, NewsItem(
+                title="Test article",
+                url=url,
+                # Longer than pydantic's JSON string cache holds, so decoding
+                # alone would give each row its own copy
+                source="Test Source " * 8,
+                published_at=datetime.now(),
+            ))
+            for url in urls
+        ])
+
+        first, second = aggregator._get_cache_batch(urls).values()
+
+        assert first.source == "Test Source " * 8
+        assert first.source is second.source
+
     def test_cache_set_get(self, aggregator):
         """Test caching works."""
-        data = {
-            "title": "Test article",
-            "url": "https://test.com",
-            "source": "Test",
-            "published_at": datetime.now().isoformat(),
-        }
+        item = NewsItem(
+            title="Test article",
+            url="https://test.com",
+            source="Test",
+            published_at=datetime.now(),
+        )
 
         # Set cache
-        aggregator._set_cache("https://test.com", data)
+        aggregator._set_cache("https://test.com", item)
 
         # Get cache
         result = aggregator._get_cache("https://test.com")
 
-        assert result is not None
-        assert result["title"] == "Test article"
-        assert result["url"] == "https://test.com"
+        assert result == item
+        assert result.title == "Test article"
+        assert result.url == "https://test.com"
+
+    def test_flush_cache_batch(self, aggregator):
+        """Test batched cache writes land in one flush."""
+        rows = [
+            aggregator._cache_row(f"https://batch.com/{i}", NewsItem(
+                title=f"Batch article {i}",
+                url=f"https://batch.com/{i}",
+                source="Test",
+                published_at=datetime.now(),
+            ))
+            for i in range(3)
+        ]
+
+        aggregator._flush_cache(rows)
+
+        for i in range(3):
+            result = aggregator._get_cache(f"https://batch.com/{i}")
+            assert result is not None
+            assert result.title == f"Batch article {i}"
+
+    def test_get_cache_batch(self, aggregator):
+        """Test batched cache lookup returns only cached URLs."""
+        aggregator._set_cache("https://batch.com/hit", NewsItem(
+            title="Cached article",
+            url="https://batch.com/hit",
+            source="Test",
+            published_at=datetime.now(),
+        ))
+
+        result = aggregator._get_cache_batch(["https://batch.com/hit", "https://batch.com/miss"])
+
+        assert list(result) == ["https://batch.com/hit"]
+        assert result["https://batch.com/hit"].title == "Cached article"
+
+    def test_url_hash_is_stable_int64(self, aggregator):
+        """Test cache keys are deterministic signed 64-bit integers."""
+        url_hash = aggregator._url_hash("https://test.com")
+
+        assert url_hash == aggregator._url_hash("https://test.com")
+        assert url_hash != aggregator._url_hash("https://test.com/other")
+        assert -(2 ** 63) <= url_hash < 2 ** 63
+
+    def test_cache_uses_wal(self, aggregator):
+        """Test cache database runs in WAL mode."""
+        conn = sqlite3.connect(aggregator.cache_db)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+        assert mode == "wal"
 
     def test_cache_expiration_direct_db_check(self, aggregator):
         """Test cache expiration by checking DB timestamp directly."""
@@ -73,11 +150,10 @@ class TestNewsAggregator:
 
         # Manually insert old cache into DB
         conn = sqlite3.connect(aggregator.cache_db)
-        import hashlib
-        url_hash = hashlib.md5("https://old.com".encode()).hexdigest()
+        url_hash = aggregator._url_hash("https://old.com")
         conn.execute(
             """
-            INSERT OR REPLACE INTO news_cache (url_hash, data, cached_at)
+            INSERT OR REPLACE INTO news_cache_v2 (url_hash, data, cached_at)
             VALUES (?, ?, ?)
             """,
             (url_hash,
@@ -90,7 +166,7 @@ class TestNewsAggregator:
         # Now verify the cached_at timestamp is > 2 hours old
         conn = sqlite3.connect(aggregator.cache_db)
         cursor = conn.execute(
-            "SELECT cached_at FROM news_cache WHERE url_hash = ?",
+            "SELECT cached_at FROM news_cache_v2 WHERE url_hash = ?",
             (url_hash,)
         )
         row = cursor.fetchone()
@@ -105,12 +181,12 @@ class TestNewsAggregator:
 
     def test_cache_valid_within_window(self, aggregator):
         """Test cache is valid within 2 hours."""
-        recent_data = {
-            "title": "Recent article",
-            "url": "https://recent.com",
-            "source": "Test",
-            "published_at": (datetime.now() - timedelta(hours=1)).isoformat(),
-        }
+        recent_data = NewsItem(
+            title="Recent article",
+            url="https://recent.com",
+            source="Test",
+            published_at=datetime.now() - timedelta(hours=1),
+        )
 
         # Set recent cache
         aggregator._set_cache("https://recent.com", recent_data)
@@ -119,32 +195,154 @@ class TestNewsAggregator:
         result = aggregator._get_cache("https://recent.com")
 
         assert result is not None
-        assert result["title"] == "Recent article"
+        assert result.title == "Recent article"
 
-    @patch('src.aggregator.feedparser.parse')
-    def test_fetch_rss(self, mock_parse, aggregator):
+    def test_fetch_rss(self, aggregator):
         """Test RSS fetching."""
         # Mock RSS feed
-        mock_feed = Mock()
-        mock_entry = Mock()
-        mock_entry.link = "https://example.com/1"
-        mock_entry.title = "Bitcoin rallies"
-        mock_entry.published_parsed = datetime.now().timetuple()
-        mock_entry.summary = "<p>BTC up 10%</p>"
-        mock_entry.get = Mock(side_effect=lambda key, default=None: {
-            'title': 'Bitcoin rallies',
-            'summary': '<p>BTC up 10%</p>',
-            'link': 'https://example.com/1'
-        }.get(key))
-
-        mock_feed.entries = [mock_entry]
-        mock_parse.return_value = mock_feed
+        mock_response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        mock_response.content = b"""<?xml version="1.0"?>
+            <rss version="2.0"><channel>
+              <item>
+                <title>Bitcoin rallies</title>
+                <link>https://example.com/1</link>
+                <pubDate>""" + datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000").encode() + b"""</pubDate>
+                <description>&lt;p&gt;BTC up 10%&lt;/p&gt;</description>
+              </item>
+            </channel></rss>"""
+        aggregator.session.get = Mock(return_value=mock_response)
 
         # Fetch
         items = aggregator._fetch_rss("coindesk")
 
         assert len(items) > 0
         assert any("Bitcoin" in item.title for item in items)
+        assert items[0].summary == "BTC up 10%"
+        assert items[0].url == "https://example.com/1"
+
+        # Unchanged feed: server answers 304 and cached entries are reused
+        aggregator.session.get = Mock(return_value=Mock(status_code=304, headers={}))
+
+        items = aggregator._fetch_rss("coindesk")
+
+        assert aggregator.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert [item.title for item in items] == ["Bitcoin rallies"]
+
+    def test_fetch_rss_bad_description(self, aggregator):
+        """Test a description lxml cannot strip does not drop the rest of the feed."""
+        descriptions = [b"&lt;p&gt;One&lt;/p&gt;", b"Two&#1; &lt;b&gt;bold&lt;/b&gt;", b"Three", b"Four"]
+        mock_response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        mock_response.content = b"<rss><channel>" + b"".join(
+            b"<item><title>t%d</title><link>https://example.com/%d</link><description>%s</description></item>"
+            % (i, i, description)
+            for i, description in enumerate(descriptions)
+        ) + b"</channel></rss>"
+        aggregator.session.get = Mock(return_value=mock_response)
+
+        items = aggregator._fetch_rss("coindesk")
+
+        assert [item.title for item in items] == ["t0", "t1", "t2", "t3"]
+        assert items[1].summary.startswith("Two")
+        assert "\x01" not in items[1].summary
+        assert aggregator._get_feed_meta("coindesk") is not None
+
+    def test_fetch_rss_skips_entries_before_cutoff(self, aggregator):
+        """Test entries outside the window are dropped before caching."""
+        def pub_date(hours_ago):
+            published = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+            return published.strftime("%a, %d %b %Y %H:%M:%S +0000").encode()
+
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.content = b"""<?xml version="1.0"?>
+            <rss version="2.0"><channel>
+              <item>
+                <title>Fresh news</title>
+                <link>https://example.com/fresh</link>
+                <pubDate>""" + pub_date(1) + b"""</pubDate>
+              </item>
+              <item>
+                <title>Stale news</title>
+                <link>https://example.com/stale</link>
+                <pubDate>""" + pub_date(48) + b"""</pubDate>
+              </item>
+            </channel></rss>"""
+        aggregator.session.get = Mock(return_value=mock_response)
+
+        items = aggregator._fetch_rss("coindesk", cutoff=datetime.now() - timedelta(hours=24))
+
+        assert [item.title for item in items] == ["Fresh news"]
+        assert aggregator._get_cache("https://example.com/stale") is None
+
+    def test_fetch_rss_unavailable_returns_none(self, aggregator):
+        """Test a failed feed signals the caller to fall back to scraping."""
+        aggregator.session.get = Mock(side_effect=ConnectionError("offline"))
+
+        assert aggregator._fetch_rss("coindesk") is None
+
+    def test_parse_feed(self):
+        """Test feed parsing returns plain tuples and None when empty."""
+        content = b"""<rss version="2.0"><channel>
+              <item>
+                <title> Solana upgrade </title>
+                <link> https://example.com/sol </link>
+                <pubDate>Mon, 06 Jan 2025 12:30:00 +0100</pubDate>
+                <description>&lt;b&gt;SOL&lt;/b&gt;</description>
+              </item>
+            </channel></rss>"""
+
+        assert parse_feed(content) == [
+            ("https://example.com/sol", "Solana upgrade", datetime(2025, 1, 6, 11, 30), "<b>SOL</b>"),
+        ]
+        assert parse_feed(content, cutoff=datetime(2025, 1, 7)) == []
+        assert parse_feed(b"<rss><channel></channel></rss>") is None
+        # Not a feed: an error page served with status 200, or no body at all
+        assert parse_feed(b"Service unavailable") is None
+        assert parse_feed(b"<html><body><h1>Error</h1></body></html>") is None
+        assert parse_feed(b"") is None
+
+    def test_rss_parser_per_thread(self):
+        """Test fetch workers never share an lxml parser."""
+        other = []
+        worker = threading.Thread(target=lambda: other.append(_rss_parser()))
+        worker.start()
+        worker.join()
+
+        assert _rss_parser() is _rss_parser()
+        assert other[0] is not _rss_parser()
+
+    def test_scrape_homepage(self, aggregator):
+        """Test homepage scraping fallback."""
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.text = """
+            <html><body>
+              <h2><a href="/markets/btc-rallies">Bitcoin rallies</a></h2>
+              <h2><a href="https://example.com/eth">Ethereum slips</a></h2>
+            </body></html>"""
+        aggregator.session.get = Mock(return_value=mock_response)
+
+        items = aggregator._scrape_homepage("coindesk")
+
+        assert [item.title for item in items] == ["Bitcoin rallies", "Ethereum slips"]
+        assert items[0].url == "https://www.coindesk.com/markets/btc-rallies"
+        assert items[0].source == "CoinDesk"
+
+    def test_fetch_top_k(self, aggregator):
+        """Test fetch keeps only the most recent items when top_k is set."""
+        now = datetime.now()
+        items = [
+            NewsItem(
+                title=f"News {hours}h",
+                url=f"https://example.com/{hours}",
+                source="Test",
+                published_at=now - timedelta(hours=hours),
+            )
+            for hours in (5, 1, 3, 2, 4)
+        ]
+
+        with patch.object(aggregator, "_fetch_source", return_value=items):
+            result = aggregator.fetch(sources=["coindesk"], top_k=3)
+
+        assert [item.title for item in result] == ["News 1h", "News 2h", "News 3h"]
 
     def test_fetch_with_time_filter(self, aggregator):
         """Test time filtering works."""
@@ -51,6 +51,13 @@ class TestNewsAnalyzer:
 
         assert len(assets) == 0
 
+    def test_extract_crypto_assets_whole_words(self):
+        """Test tickers inside other words are not matched."""
+        text = "Fetch.ai and Uniswap unveil a landmark sandbox"
+        assets = extract_crypto_assets(text)
+
+        assert len(assets) == 0
+
     def test_extract_crypto_assets_deduplicate(self):
         """Test deduplication works."""
         text = "BTC BTC Bitcoin BTC Bitcoin"  # Repeated mentions
@@ -59,6 +66,16 @@ class TestNewsAnalyzer:
         assert len(assets) == 1
         assert "BTC" in assets
 
+    def test_extract_crypto_assets_repeat_call(self):
+        """Test memoized results are not shared between callers."""
+        text = "Solana and SOL traders eye ETH"
+        first = extract_crypto_assets(text)
+        first.append("DOGE")
+
+        second = extract_crypto_assets(text)
+
+        assert sorted(second) == ["ETH", "SOL"]
+
     def test_create_analysis(self, analyzer):
         """Test creating news analysis."""
         from src.aggregator import NewsItem
@@ -86,6 +103,7 @@ class TestNewsAnalyzer:
         assert "BTC" in analysis.assets
         assert analysis.confidence == 85
         assert analysis.actionable is True
+        assert analysis.published_at == item.published_at
 
     def test_create_analysis_bearish(self, analyzer):
         """Test creating bearish analysis."""
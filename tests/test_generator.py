@@ -1,12 +1,33 @@
 """Tests for signal generator."""
 
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from src.generator import SignalGenerator, format_signal, Direction
+import numpy as np
+
+from src.generator import Signal, SignalGenerator, format_signal, format_signals, Direction, _aggregate
+from src.aggregator import parse_feed
 from src.analyzer import NewsAnalysis, Sentiment, Impact
 
 
+def make_analysis(**overrides) -> NewsAnalysis:
+    """Build an actionable bullish BTC analysis, with any field overridden."""
+    fields = dict(
+        title="Bitcoin surges to $100k",
+        url="https://example.com",
+        source="CoinDesk",
+        sentiment=Sentiment.BULLISH,
+        impact=Impact.HIGH,
+        assets=["BTC"],
+        confidence=85,
+        actionable=True,
+        key_takeaways=["Breakout above resistance"],
+        reasoning="Strong buy pressure",
+    )
+    fields.update(overrides)
+    return NewsAnalysis(**fields)
+
+
 class TestSignalGenerator:
     """Test signal generator functionality."""
 
@@ -29,7 +50,8 @@ class TestSignalGenerator:
 
     def test_score_recency(self, generator):
         """Test recency scoring."""
-        now = datetime.now()
+        # Publish times are naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
 
         # Fresh news (< 6h) = 1.0
         assert generator._score_recency(now) == 1.0
@@ -40,6 +62,27 @@ class TestSignalGenerator:
         # Old news (> 12h) = 0.4
         assert generator._score_recency(now - timedelta(hours=18)) == 0.4
 
+    def test_score_recency_explicit_now(self, generator):
+        """Test recency is measured against the given reference time."""
+        now = datetime(2025, 1, 6, 12, 0)
+
+        assert generator._score_recency(datetime(2025, 1, 6, 7, 0), now=now) == 1.0
+        assert generator._score_recency(datetime(2025, 1, 6, 1, 0), now=now) == 0.7
+        assert generator._score_recency(datetime(2025, 1, 5, 12, 0), now=now) == 0.4
+
+    def test_aggregate_groups(self):
+        """Test grouped reduction of per-news scores."""
+        group_ids = np.array([0, 0, 1, 1, 1])
+        sentiments = np.array([1, -1, 1, 1, 0], dtype=np.int8)
+        weights = np.array([2.0, 1.0, 0.5, 0.5, 0.0])
+
+        total_score, total_weight, bullish, bearish = _aggregate(group_ids, sentiments, weights, 3)
+
+        assert total_score.tolist() == [1.0, 1.0, 0.0]
+        assert total_weight.tolist() == [3.0, 1.0, 0.0]
+        assert bullish.tolist() == [1, 2, 0]
+        assert bearish.tolist() == [1, 0, 0]
+
     def test_generate_signals_bullish(self, generator):
         """Test generating bullish signal."""
         analyses = [
@@ -63,6 +106,11 @@ class TestSignalGenerator:
         assert signals[0].asset == "BTC"
         assert signals[0].direction == Direction.LONG
 
+        # Signals skip validation on construction but must still be valid
+        assert Signal.model_validate(signals[0].model_dump()) == signals[0]
+        # Output timestamps carry their timezone
+        assert signals[0].last_updated.utcoffset() == timedelta(0)
+
     def test_generate_signals_bearish(self, generator):
         """Test generating bearish signal."""
         analyses = [
@@ -121,6 +169,72 @@ class TestSignalGenerator:
         assert len(signals) > 0
         assert signals[0].asset == "BTC"
 
+    def test_generate_signals_recency(self, generator):
+        """Test older news carries less weight."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        fresh = generator.generate_signals([make_analysis(published_at=now - timedelta(hours=1))], min_confidence=0)
+        stale = generator.generate_signals([make_analysis(published_at=now - timedelta(hours=18))], min_confidence=0)
+
+        assert fresh[0].confidence > stale[0].confidence
+
+    def test_generate_signals_recency_from_feed(self, generator):
+        """Test a feed item published an hour ago scores as fresh in any timezone."""
+        pub_date = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        [(_, _, published_at, _)] = parse_feed(
+            f"""<rss><channel><item>
+                  <title>Bitcoin surges</title>
+                  <link>https://example.com/btc</link>
+                  <pubDate>{pub_date}</pubDate>
+                </item></channel></rss>""".encode()
+        )
+
+        from_feed = generator.generate_signals([make_analysis(published_at=published_at)], min_confidence=0)
+        undated = generator.generate_signals([make_analysis()], min_confidence=0)
+
+        assert generator._score_recency(published_at) == 1.0
+        assert from_feed[0].confidence == undated[0].confidence
+
+    def test_generate_signals_aware_published_at(self, generator):
+        """Test aware publish times score like the same instant in naive UTC."""
+        published_at = datetime.now(timezone.utc) - timedelta(hours=8)
+
+        bangkok = timezone(timedelta(hours=7))
+        aware = [make_analysis(published_at=published_at.astimezone(bangkok))]
+        naive = [make_analysis(published_at=published_at.replace(tzinfo=None))]
+
+        assert generator._score_recency(aware[0].published_at) == 0.7
+        for copies in (1, 2):
+            from_aware = generator.generate_signals(aware * copies, min_confidence=0)
+            from_naive = generator.generate_signals(naive * copies, min_confidence=0)
+            assert from_aware[0].confidence == from_naive[0].confidence
+
+    def test_risk_scanned_only_for_emitted_signals(self, generator, monkeypatch):
+        """Test reasoning is searched for risk only behind kept signals, once each."""
+        import src.generator as generator_module
+
+        scanned = []
+        risk_re = generator_module._RISK_RE
+
+        class RecordingRe:
+            def search(self, text):
+                scanned.append(text)
+                return risk_re.search(text)
+
+        monkeypatch.setattr(generator_module, "_RISK_RE", RecordingRe())
+
+        analyses = [
+            make_analysis(assets=["BTC", "ETH"], reasoning="Risk of a pullback"),
+            make_analysis(reasoning="Steady inflows"),
+            # Weight below 1.0, so SOL emits no signal
+            make_analysis(assets=["SOL"], impact=Impact.LOW, reasoning="Risk of delisting"),
+        ]
+
+        signals = generator.generate_signals(analyses, min_confidence=0)
+
+        assert sorted(s.asset for s in signals) == ["BTC", "ETH"]
+        assert sorted(scanned) == ["Risk of a pullback", "Steady inflows"]
+
     def test_min_confidence_filter(self, generator):
         """Test confidence filtering."""
         # Single bullish article with HIGH impact yields ~51% confidence
@@ -234,3 +348,22 @@ class TestFormatSignal:
         assert '⚪' in output
         assert 'BTC' in output
         assert 'NEUTRAL' in output
+
+    def test_format_signals_batch(self):
+        """Test batch formatting matches per-signal output joined by blank lines."""
+        signals = [
+            type('Signal', (), {
+                'direction': direction,
+                'asset': asset,
+                'confidence': 70,
+                'key_drivers': [],
+                'risk_notes': ['Watch resistance'],
+                'news_count': 2,
+            })()
+            for direction, asset in ((Direction.LONG, 'BTC'), (Direction.SHORT, 'ETH'))
+        ]
+
+        output = format_signals(signals)
+
+        assert output == "\n\n".join(format_signal(s) for s in signals)
+        assert format_signals([]) == ""
@@ -0,0 +1,56 @@
+"""Tests for the CLI keyword heuristics."""
+
+from news_trader import KEYWORD_FLAGS, classify_titles
+from src.analyzer import Sentiment, Impact
+
+
+class TestClassifyTitles:
+    """Test headline classification."""
+
+    def test_bullish_beats_bearish(self):
+        """Test a title with both bullish and bearish keywords is bullish."""
+        sentiments, _ = classify_titles(["Bitcoin rally stalls as bears fear a crash"])
+
+        assert sentiments == [Sentiment.BULLISH]
+
+    def test_high_impact_beats_medium(self):
+        """Test a title with high and medium impact keywords is high impact."""
+        _, impacts = classify_titles(["Market update: ETH hits record"])
+
+        assert impacts == [Impact.HIGH]
+
+    def test_substring_matches(self):
+        """Test keywords match inside longer words, case-insensitively."""
+        sentiments, impacts = classify_titles(["Solana SURGES after breakout", "Dogecoin plunges"])
+
+        assert sentiments == [Sentiment.BULLISH, Sentiment.BEARISH]
+        assert impacts == [Impact.HIGH, Impact.LOW]
+
+    def test_keywords_stay_in_their_title(self):
+        """Test each title gets only its own keywords, including around empty titles."""
+        # A keyword ending a title late in the batch lands next to the
+        # following title's offset, so any offset drift misattributes it
+        titles = ["", "Quiet day", "", "Calm", "", "Flat", "", "Prices plunge", "Major news", ""]
+
+        sentiments, impacts = classify_titles(titles)
+
+        assert sentiments == [Sentiment.NEUTRAL] * 7 + [Sentiment.BEARISH] + [Sentiment.NEUTRAL] * 2
+        assert impacts == [Impact.LOW] * 8 + [Impact.HIGH, Impact.LOW]
+
+    def test_titles_with_newlines(self):
+        """Test titles containing the buffer separator keep their offsets."""
+        sentiments, impacts = classify_titles(["Quiet\nday\n", "ETH\njumps", "Weekly\nreport"])
+
+        assert sentiments == [Sentiment.NEUTRAL, Sentiment.BULLISH, Sentiment.NEUTRAL]
+        assert impacts == [Impact.LOW, Impact.LOW, Impact.MEDIUM]
+
+    def test_empty_batch(self):
+        """Test no titles gives no classifications."""
+        assert classify_titles([]) == ([], [])
+
+    def test_no_keyword_prefixes_another_category(self):
+        """Test no keyword shadows one with different flags at the same position."""
+        for keyword, flag in KEYWORD_FLAGS.items():
+            for other, other_flag in KEYWORD_FLAGS.items():
+                if other != keyword and other.startswith(keyword):
+                    assert other_flag == flag, (keyword, other)